@@ -1,4 +1,5 @@
 
+import asyncio
 import gradio as gr
 from saas_idea_generator import SaasIdeaGenerator
 import random
@@ -22,7 +23,11 @@ except Exception as e:
     error_message = f"Unexpected error: {str(e)}"
     print(error_message)
 
-def generate_idea(industry, pain_point, tech_stack):
+# Dropdown choices never change, so build them once at import
+INDUSTRIES = ["Random", *idea_generator.industries] if api_initialized else ["Random"]
+TECH_STACKS = ["Random", *idea_generator.tech_stacks] if api_initialized else ["Random"]
+
+async def generate_idea(industry, pain_point, tech_stack):
     """Generate a SaaS idea based on user inputs"""
     
     if not api_initialized:
@@ -43,14 +48,16 @@ def generate_idea(industry, pain_point, tech_stack):
     pain_point_input = None if not pain_point.strip() else pain_point
     
 
-        # Generate the idea using the API
-    idea = idea_generator.generate_idea(
+        # Generate the idea using the API; the blocking call runs in a worker thread
+    idea = await asyncio.to_thread(
+        idea_generator.generate_idea,
         industry=industry_input,
         pain_point=pain_point_input, 
         tech_stack=tech_stack_input
     )
     
         # Format the output for display
+    features = '\n'.join(f'- {feature}' for feature in idea['key_features'])
     output = f"""
 ## {idea['name']}
 
@@ -61,7 +68,7 @@ def generate_idea(industry, pain_point, tech_stack):
 **Tech Stack:** {idea['tech_stack']}
 
 ### Key Features:
-{'\n'.join(['- ' + feature for feature in idea['key_features']])}
+{features}
 
 **Target Customers:** {idea['target_customers']}
 
@@ -93,17 +100,14 @@ with gr.Blocks(title="Micro SaaS Idea Generator", theme=gr.themes.Soft()) as dem
     with gr.Row():
         with gr.Column():
             # Input components
-            industries =  ["Random"] + (idea_generator.industries if api_initialized else [])
-            tech_stacks = ["Random"] + (idea_generator.tech_stacks if api_initialized else [])
-            
             industry_dropdown = gr.Dropdown(
-                choices=industries,
+                choices=INDUSTRIES,
                 value="Random", 
                 label="Target Industry"
             )
             
             tech_stack_dropdown = gr.Dropdown(
-                choices=tech_stacks, 
+                choices=TECH_STACKS, 
                 value="Random", 
                 label="Tech Stack"
             )
@@ -141,5 +145,8 @@ with gr.Blocks(title="Micro SaaS Idea Generator", theme=gr.themes.Soft()) as dem
     )
     
 
+# Let several Gemini calls run at once instead of serializing users
+demo.queue(default_concurrency_limit=8)
+
 if __name__ == "__main__":
     demo.launch() 
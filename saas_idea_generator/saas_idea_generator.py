@@ -1,11 +1,44 @@
 import google.generativeai as genai
 import os
-import json
+import re
+import copy
+import orjson
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Matches a leading ``` / ```json fence and a trailing ``` fence
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+# Fixed part of the prompt. Keeping it identical and in front of the
+# per-request line lets Gemini reuse its cached prompt prefix.
+PROMPT_PREFIX = """
+You generate detailed micro-SaaS business ideas.
+
+Your response should be in JSON format with the following structure:
+{
+    "name": "A catchy product name that's memorable and describes the function",
+    "description": "A clear description of what the product does and the value it provides",
+    "industry": "The specific industry this serves",
+    "tech_stack": "The technology stack that would be ideal for building this differentiate with front end, back end and database",
+    "key_features": ["Feature 1", "Feature 2", "Feature 3"],
+    "target_customers": "Description of the ideal customer",
+    "development_time": "Estimated time to develop an MVP",
+    "monetization": "Best pricing model and price point"
+}
+
+Be creative and practical. Focus on an idea that:
+1. Could be built by a small team or solo developer
+2. Solves a real problem in the target industry
+3. Has clear monetization potential
+4. Is specific enough to be actionable
+5. Would be technically feasible with the specified technology
+
+Return ONLY the JSON with no additional text.
+"""
+
 class SaasIdeaGenerator:
     """A Micro SaaS Idea Generator that uses Google's Gemini Pro API.
     
@@ -40,42 +73,26 @@ class SaasIdeaGenerator:
             "Desktop Application", "API Service", "AI-powered Tool",
             "Shopify App", "Automation Tool", "Data Analytics Dashboard"
         ]
+
+        # Remember generated ideas per (industry, pain_point, tech_stack) so
+        # repeated requests skip the Gemini round-trip
+        self._cached_idea = lru_cache(maxsize=256)(self._request_idea)
     
     def generate_prompt(self, industry=None, pain_point=None, tech_stack=None):
-        """Generate a prompt for the LLM based on the inputs."""
+        """Generate the prompt parts for the LLM based on the inputs."""
         industry_text = f"in the {industry} industry" if industry else "in any promising industry"
         tech_text = f"using {tech_stack}" if tech_stack else "using any suitable technology stack"
         pain_text = f"that solves the problem of '{pain_point}'" if pain_point else "that solves a valuable problem"
         
-        prompt = f"""
-        Generate a detailed micro-SaaS business idea {industry_text} {tech_text} {pain_text}.
-
-        Your response should be in JSON format with the following structure:
-        {{
-            "name": "A catchy product name that's memorable and describes the function",
-            "description": "A clear description of what the product does and the value it provides",
-            "industry": "The specific industry this serves",
-            "tech_stack": "The technology stack that would be ideal for building this differentiate with front end, back end and database",
-            "key_features": ["Feature 1", "Feature 2", "Feature 3"],
-            "target_customers": "Description of the ideal customer",
-            "development_time": "Estimated time to develop an MVP",
-            "monetization": "Best pricing model and price point"
-        }}
-
-        Be creative and practical. Focus on an idea that:
-        1. Could be built by a small team or solo developer
-        2. Solves a real problem in the target industry
-        3. Has clear monetization potential
-        4. Is specific enough to be actionable
-        5. Would be technically feasible with the specified technology
-        
-        Return ONLY the JSON with no additional text.
-        """
-        return prompt
+        # Static instructions go first so every request shares the same prefix
+        return [PROMPT_PREFIX, f"Generate a detailed micro-SaaS business idea {industry_text} {tech_text} {pain_text}."]
 
     def generate_idea(self, industry=None, pain_point=None, tech_stack=None):
         """Generate a micro SaaS idea based on provided parameters using Gemini Pro.
         
+        Ideas are cached per combination of arguments, so asking again for the
+        same inputs returns the earlier idea without calling the API.
+        
         Args:
             industry (str, optional): Target industry for the SaaS idea
             pain_point (str, optional): Specific problem to solve
@@ -89,6 +106,10 @@ class SaasIdeaGenerator:
             ConnectionError: If there's an issue connecting to the API
             RuntimeError: For other API-related issues
         """
+        return copy.deepcopy(self._cached_idea(industry, pain_point, tech_stack))
+
+    def _request_idea(self, industry, pain_point, tech_stack):
+        """Ask Gemini for a new idea; see generate_idea for arguments and errors."""
         # Generate the prompt for the LLM
         prompt = self.generate_prompt(industry, pain_point, tech_stack)
         
@@ -98,19 +119,13 @@ class SaasIdeaGenerator:
             
             # Try to parse the JSON response
             try:
-                # Extract the text from the response
-                text = response.text.strip()
-                
-                # Sometimes the AI includes ```json and ``` around the response, so we remove those
-                if text.startswith('```json'):
-                    text = text[7:]
-                if text.endswith('```'):
-                    text = text[:-3]
+                # Sometimes the AI wraps the JSON in ``` or ```json fences, so we remove those
+                text = _FENCE_RE.sub('', response.text)
                 
                 # Parse the JSON
-                return json.loads(text.strip())
+                return orjson.loads(text)
             
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 raise RuntimeError(f"Failed to parse JSON response from Gemini: {str(e)}")
         
         except Exception as e:
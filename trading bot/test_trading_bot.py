@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import trading_bot
+
+
+def _history(tickers):
+    """What yf.download returns: upper-cased tickers over a (ticker, field) MultiIndex."""
+    dates = pd.date_range(end="2024-01-31", periods=22, freq="B")
+    close = np.linspace(100.0, 120.0, len(dates))
+    frames = {
+        ticker.upper(): pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1_000.0},
+            index=dates,
+        )
+        for ticker in tickers
+    }
+    return pd.concat(frames, axis=1)
+
+
+class _Ticker:
+    def __init__(self, symbol):
+        self.info = {"shortName": symbol.upper(), "currency": "USD"}
+
+
+def test_lowercase_ticker_gets_stats(monkeypatch):
+    monkeypatch.setattr(trading_bot.yf, "download", lambda tickers, **kwargs: _history(tickers))
+    monkeypatch.setattr(trading_bot.yf, "Ticker", _Ticker)
+    trading_bot._stock_cache.clear()
+    trading_bot._meta_cache.clear()
+
+    with TestClient(trading_bot.app) as client:
+        response = client.post("/portfolio-analytics", json={"holdings": {"aapl": 1, " msft ": 2}})
+
+    assert response.status_code == 200
+    assert response.json()["total_value"] == 360.0
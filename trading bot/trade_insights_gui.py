@@ -1,10 +1,31 @@
+import json
 import streamlit as st
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
 
 st.set_page_config(page_title="Trade Insights Bot", layout="wide")
 st.title("🚀 Next-Gen Trade Insights Bot")
 
+# Keep one pooled session per browser session so reruns reuse connections to the API
+if "http" not in st.session_state:
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+    st.session_state.http = session
+http = st.session_state.http
+
+def sse_events(resp):
+    """Yield (event, data) pairs from a server-sent event stream."""
+    event = "message"
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line:
+            event = "message"
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[5:])
+
 # --- Watchlist & Portfolio ---
 st.sidebar.header("Watchlist & Portfolio")
 tickers = st.sidebar.text_input("Enter tickers (comma separated)", "BTC-USD, AAPL, TSLA").split(",")
@@ -21,7 +42,7 @@ for t in tickers:
 # --- Economic Calendar ---
 st.sidebar.header("Economic Calendar")
 if st.sidebar.button("Show Upcoming Events"):
-    econ_events = requests.get("http://localhost:8000/").json().get("message", "Error")
+    econ_events = http.get("http://localhost:8000/").json().get("message", "Error")
     st.sidebar.write(econ_events)
 
 # --- Trade Insights ---
@@ -29,15 +50,24 @@ st.subheader("Trade Insights")
 query = st.text_area("Enter your trade insights query:", "Analyze my watchlist and provide actionable insights.")
 if st.button("Get Insights"):
     with st.spinner("Fetching insights..."):
-        resp = requests.post("http://localhost:8000/trade-insights", json={
+        resp = http.post("http://localhost:8000/trade-insights", json={
             "query": query,
             "tickers": tickers,
-            "indicators": indicators
-        })
+            "indicators": indicators,
+            "stream": True
+        }, stream=True)
         if resp.status_code == 200:
-            data = resp.json()
-            st.markdown(data["result"])
-            st.json(data["stats"])
+            stats = {}
+            def insight_tokens():
+                for event, data in sse_events(resp):
+                    if event == "stats":
+                        stats.update(data)
+                    elif event == "error":
+                        st.error(data)
+                    elif event == "message":
+                        yield data
+            st.write_stream(insight_tokens())
+            st.json(stats)
         else:
             st.error(resp.text)
 
@@ -45,7 +75,7 @@ if st.button("Get Insights"):
 st.subheader("Portfolio Analytics")
 if st.button("Analyze Portfolio"):
     with st.spinner("Analyzing..."):
-        resp = requests.post("http://localhost:8000/portfolio-analytics", json={
+        resp = http.post("http://localhost:8000/portfolio-analytics", json={
             "holdings": portfolio,
             "indicators": indicators
         })
@@ -60,7 +90,7 @@ st.subheader("Strategy Backtest")
 strategy = st.text_area("Describe your backtest strategy:", "Backtest a simple moving average crossover on BTC-USD for the last 2 years.")
 if st.button("Run Backtest"):
     with st.spinner("Running backtest..."):
-        resp = requests.post("http://localhost:8000/backtest", json={"strategy": strategy})
+        resp = http.post("http://localhost:8000/backtest", json={"strategy": strategy})
         if resp.status_code == 200:
             st.markdown(resp.json()["backtest_result"])
         else:
@@ -71,7 +101,7 @@ st.subheader("Compare Strategies")
 strategies = st.text_area("Enter strategies to compare (one per line):", "SMA crossover on BTC-USD\nRSI strategy on AAPL").split("\n")
 if st.button("Compare"):
     with st.spinner("Comparing..."):
-        resp = requests.post("http://localhost:8000/compare-strategies", json={"strategies": strategies})
+        resp = http.post("http://localhost:8000/compare-strategies", json={"strategies": strategies})
         if resp.status_code == 200:
             st.markdown(resp.json()["comparison"])
         else:
@@ -81,7 +111,7 @@ if st.button("Compare"):
 st.subheader("Sentiment History")
 sentiment_topic = st.text_input("News topic for sentiment history", "BTC NASDAQ market")
 if st.button("Show Sentiment History"):
-    resp = requests.get(f"http://localhost:8000/sentiment-history?news_topic={sentiment_topic}")
+    resp = http.get(f"http://localhost:8000/sentiment-history?news_topic={sentiment_topic}")
     if resp.status_code == 200:
         hist = resp.json()["history"]
         df = pd.DataFrame(hist)
@@ -95,7 +125,7 @@ feedback_query = st.text_input("What did you ask the bot?", "")
 rating = st.slider("How helpful was the answer?", 1, 5, 3)
 comments = st.text_area("Additional comments (optional):", "")
 if st.button("Submit Feedback"):
-    resp = requests.post("http://localhost:8000/feedback", json={
+    resp = http.post("http://localhost:8000/feedback", json={
         "query": feedback_query,
         "rating": rating,
         "comments": comments
@@ -1,31 +1,71 @@
 
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, AsyncIterator
 import httpx
+import orjson
 from fastapi import FastAPI, Request, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import yfinance as yf
+from cachetools import TTLCache, cached
+import numpy as np
 import pandas as pd
-import ta
-import quantstats as qs
-import ffn
 from duckduckgo_search import DDGS
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 
 # --- CONFIGURATION ---
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY", "tgp_v1_yiOzJa4FDB68ZmOLU76CKILY2a60Y2CDiykBdfni75A")
 TOGETHER_API_URL = "https://api.together.xyz/v1/chat/completions"
 MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
+STOCK_CACHE_TTL = int(os.getenv("STOCK_CACHE_TTL", "120"))
+CALENDAR_CACHE_TTL = int(os.getenv("CALENDAR_CACHE_TTL", "3600"))
+NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "180"))
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+META_CACHE_TTL = int(os.getenv("META_CACHE_TTL", "86400"))
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "32"))
 
 # --- LOGGING SETUP ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("trade-insights-bot")
 
+# --- JSON RESPONSES ---
+def _orjson_default(obj: Any) -> Any:
+    # numpy/pandas scalars coming out of yfinance and the indicators
+    if hasattr(obj, "item"):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(content: Any) -> bytes:
+    return orjson.dumps(
+        content,
+        default=_orjson_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+class OrjsonResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+def _model_response(model: BaseModel) -> OrjsonResponse:
+    # Already-validated model: dump once and skip FastAPI's jsonable_encoder
+    return OrjsonResponse(content=model.model_dump(mode="json", exclude_none=True))
+
+def _sse(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event with a JSON payload."""
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + _dumps(data) + b"\n\n"
+
 # --- FASTAPI SETUP ---
-app = FastAPI(title="Trade Insights Bot (Ultimate Edition)")
+app = FastAPI(title="Trade Insights Bot (Ultimate Edition)", default_response_class=OrjsonResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -35,33 +75,61 @@ app.add_middleware(
 )
 
 # --- MODELS ---
-class NewsItem(BaseModel):
-    title: str
-    link: str
-    snippet: str
-    date: Optional[str] = None
-    sentiment: Optional[str] = None
-
 class StockInfo(BaseModel):
-    name: str = None
-    symbol: str = None
-    price: float = None
-    previous_close: float = None
-    currency: str = None
-    price_week_ago: float = None
-    price_month_ago: float = None
-    volume: float = None
-    avg_volume: float = None
-    volatility: float = None
-    rsi: float = None
-    macd: float = None
-    boll_upper: float = None
-    boll_lower: float = None
-    mfi: float = None
-    obv: float = None
-    atr: float = None
+    name: Optional[str] = None
+    symbol: Optional[str] = None
+    price: Optional[float] = None
+    previous_close: Optional[float] = None
+    currency: Optional[str] = None
+    price_week_ago: Optional[float] = None
+    price_month_ago: Optional[float] = None
+    volume: Optional[float] = None
+    avg_volume: Optional[float] = None
+    volatility: Optional[float] = None
+    rsi: Optional[float] = None
+    macd: Optional[float] = None
+    boll_upper: Optional[float] = None
+    boll_lower: Optional[float] = None
+    mfi: Optional[float] = None
+    obv: Optional[float] = None
+    atr: Optional[float] = None
+    alert: Optional[str] = None
+
+@dataclass(slots=True)
+class StockSnapshot:
+    """Internal, unvalidated counterpart of StockInfo, built once per ticker fetch.
+
+    Snapshots are shared through the stock cache and must not be mutated.
+    """
+    name: Optional[str] = None
+    symbol: Optional[str] = None
+    price: Optional[float] = None
+    previous_close: Optional[float] = None
+    currency: Optional[str] = None
+    price_week_ago: Optional[float] = None
+    price_month_ago: Optional[float] = None
+    volume: Optional[float] = None
+    avg_volume: Optional[float] = None
+    volatility: Optional[float] = None
+    rsi: Optional[float] = None
+    macd: Optional[float] = None
+    boll_upper: Optional[float] = None
+    boll_lower: Optional[float] = None
+    mfi: Optional[float] = None
+    obv: Optional[float] = None
+    atr: Optional[float] = None
     alert: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """StockInfo-shaped dict with unset fields left out."""
+        return {
+            name: value
+            for name in _SNAPSHOT_FIELDS
+            if (value := getattr(self, name)) is not None
+        }
+
+_SNAPSHOT_FIELDS = tuple(field.name for field in fields(StockSnapshot))
+
 class PortfolioAnalytics(BaseModel):
     total_value: float
     returns: float
@@ -77,7 +145,7 @@ class BacktestComparison(BaseModel):
 
 class TradeInsightsResponse(BaseModel):
     result: str
-    stats: Dict[str, Any] = {}
+    stats: Dict[str, StockInfo] = {}
 
 class BacktestResponse(BaseModel):
     backtest_result: str
@@ -90,82 +158,187 @@ class FeedbackRequest(BaseModel):
 class CompareStrategiesRequest(BaseModel):
     strategies: List[str]
 
-# --- DEPENDENCY: Application-wide AsyncClient ---
+# --- DEPENDENCY: Application-wide AsyncClient and worker pool ---
 @app.on_event("startup")
 async def startup_event():
     app.state.http_client = httpx.AsyncClient()
+    app.state.executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="trade-insights")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await app.state.http_client.aclose()
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
 
 async def get_http_client() -> httpx.AsyncClient:
     return app.state.http_client
 
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking helper (yfinance, DuckDuckGo) on the worker pool, keeping the event loop free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.executor, partial(func, *args, **kwargs))
+
+# --- CACHES ---
+# Ticker data and the calendar are shared across requests; the locks keep
+# the caches consistent when helpers run from worker threads.
+_stock_cache = TTLCache(maxsize=512, ttl=STOCK_CACHE_TTL)
+_stock_cache_lock = threading.RLock()
+_meta_cache = TTLCache(maxsize=512, ttl=META_CACHE_TTL)
+_meta_cache_lock = threading.RLock()
+_calendar_cache = TTLCache(maxsize=1, ttl=CALENDAR_CACHE_TTL)
+_calendar_cache_lock = threading.RLock()
+_news_cache = TTLCache(maxsize=256, ttl=NEWS_CACHE_TTL)
+_news_cache_lock = threading.RLock()
+
+# One DuckDuckGo client for the process; the lock also keeps concurrent
+# requests from hammering DDG in parallel and tripping its rate limit.
+_ddgs: Optional[DDGS] = None
+_ddgs_lock = threading.Lock()
+
 # --- HELPERS ---
-def get_stock_info(symbol: str) -> StockInfo:
+def _compute_indicators(close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray) -> Dict[str, Optional[float]]:
+    """Latest value of each technical indicator for a daily price history.
+
+    Follows the ``ta`` definitions (Wilder RSI, 12/26 MACD, 20-day Bollinger
+    bands, 14-day MFI and ATR, OBV). The recursive indicators share a single
+    pass over the bars; at a month of data the per-call overhead of separate
+    pandas rolling/ewm passes dominates the arithmetic.
+    """
+    n = len(close)
+    indicators = dict.fromkeys(("volatility", "rsi", "macd", "boll_upper", "boll_lower", "mfi", "obv", "atr"))
+    if n < 2:
+        return indicators
+    returns = close[1:] / close[:-1] - 1
+    if len(returns) > 1:
+        indicators["volatility"] = float(returns.std(ddof=1) * (252 ** 0.5))
+    if n >= 20:
+        window = close[-20:]
+        mean, std = window.mean(), window.std()
+        indicators["boll_upper"] = float(mean + 2 * std)
+        indicators["boll_lower"] = float(mean - 2 * std)
+
+    closes, highs, lows, volumes = close.tolist(), high.tolist(), low.tolist(), volume.tolist()
+    fast, slow, wilder = 2 / 13, 2 / 27, 1 / 14
+    ema_fast = ema_slow = closes[0]
+    avg_gain = avg_loss = 0.0
+    obv = volumes[0]
+    true_range_sum = highs[0] - lows[0]
+    atr = 0.0
+    prev_typical = (highs[0] + lows[0] + closes[0]) / 3
+    flows = [0.0]
+    for i in range(1, n):
+        price, prev = closes[i], closes[i - 1]
+        change = price - prev
+        ema_fast = (1 - fast) * ema_fast + fast * price
+        ema_slow = (1 - slow) * ema_slow + slow * price
+        avg_gain = (1 - wilder) * avg_gain + wilder * (change if change > 0 else 0.0)
+        avg_loss = (1 - wilder) * avg_loss + wilder * (-change if change < 0 else 0.0)
+        obv += -volumes[i] if change < 0 else volumes[i]
+        true_range = max(highs[i] - lows[i], abs(highs[i] - prev), abs(lows[i] - prev))
+        if i < 14:
+            true_range_sum += true_range
+            atr = true_range_sum / 14
+        else:
+            atr = (atr * 13 + true_range) / 14
+        typical = (highs[i] + lows[i] + price) / 3
+        direction = 1 if typical > prev_typical else -1 if typical < prev_typical else 0
+        flows.append(typical * volumes[i] * direction)
+        prev_typical = typical
+
+    indicators["obv"] = float(obv)
+    if n >= 14:
+        indicators["rsi"] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+        positive = sum(flow for flow in flows[-14:] if flow >= 0)
+        negative = -sum(flow for flow in flows[-14:] if flow < 0)
+        if negative:
+            indicators["mfi"] = 100 - 100 / (1 + positive / negative)
+        elif positive:
+            indicators["mfi"] = 100.0
+        indicators["atr"] = atr
+    if n >= 26:
+        indicators["macd"] = ema_fast - ema_slow
+    return indicators
+
+@cached(_meta_cache, key=lambda symbol: symbol, lock=_meta_cache_lock)
+def _fetch_ticker_meta(symbol: str) -> Dict[str, Optional[str]]:
+    info = yf.Ticker(symbol).info
+    return {"name": info.get("shortName"), "currency": info.get("currency")}
+
+def get_ticker_meta(symbol: str) -> Dict[str, Optional[str]]:
+    """Display name and currency for ``symbol``; these rarely change, so they are cached for a day."""
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1mo")
-        info = ticker.info
-        close = hist['Close']
-        volume = hist['Volume']
-        # Technical indicators
-        rsi = ta.momentum.RSIIndicator(close=close, window=14).rsi().iloc[-1] if len(close) >= 14 else None
-        macd = ta.trend.MACD(close=close).macd().iloc[-1] if len(close) >= 26 else None
-        bb = ta.volatility.BollingerBands(close=close, window=20)
-        boll_upper = bb.bollinger_hband().iloc[-1] if len(close) >= 20 else None
-        boll_lower = bb.bollinger_lband().iloc[-1] if len(close) >= 20 else None
-        mfi = ta.volume.MFIIndicator(high=hist['High'], low=hist['Low'], close=close, volume=volume, window=14).money_flow_index().iloc[-1] if len(close) >= 14 else None
-        obv = ta.volume.OnBalanceVolumeIndicator(close=close, volume=volume).on_balance_volume().iloc[-1] if len(close) >= 2 else None
-        atr = ta.volatility.AverageTrueRange(high=hist['High'], low=hist['Low'], close=close, window=14).average_true_range().iloc[-1] if len(close) >= 14 else None
-        volatility = close.pct_change().std() * (252 ** 0.5) if len(close) > 1 else None
-        alert = None
-        if volatility and (volatility > 0.05):
-            alert = "⚠️ Unusual volatility detected!"
-        return StockInfo(
-            name=info.get("shortName"),
-            symbol=symbol,
-            price=info.get("regularMarketPrice"),
-            previous_close=info.get("regularMarketPreviousClose"),
-            currency=info.get("currency"),
-            price_week_ago=close[-6] if len(close) > 5 else None,
-            price_month_ago=close[0] if len(close) > 0 else None,
-            volume=volume.iloc[-1] if len(volume) > 0 else None,
-            avg_volume=volume.mean() if len(volume) > 0 else None,
-            volatility=volatility,
-            rsi=rsi,
-            macd=macd,
-            boll_upper=boll_upper,
-            boll_lower=boll_lower,
-            mfi=mfi,
-            obv=obv,
-            atr=atr,
-            alert=alert
-        )
+        return _fetch_ticker_meta(symbol)
+    except Exception as e:
+        logger.error(f"Error fetching ticker info for {symbol}: {e}")
+        return {"name": None, "currency": None}
+
+def fetch_history_batch(tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Download a month of daily bars for all ``tickers`` in one yfinance call."""
+    try:
+        data = yf.download(tickers=tickers, period="1mo", group_by="ticker", auto_adjust=True, threads=True, progress=False)
     except Exception as e:
-        logger.error(f"Error fetching stock info for {symbol}: {e}")
-        return StockInfo(symbol=symbol)
+        logger.error(f"Error downloading history for {tickers}: {e}")
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {tickers[0]: data} if len(tickers) == 1 else {}
+    # Rows are aligned across tickers, so drop the dates a symbol did not trade
+    return {
+        symbol: data[symbol].dropna(how="all")
+        for symbol in tickers
+        if symbol in data.columns.get_level_values(0)
+    }
+
+def compute_stock_info(symbol: str, hist: pd.DataFrame, meta: Dict[str, Optional[str]]) -> StockSnapshot:
+    """Snapshot of ``symbol`` built from its price history, skipping pydantic validation."""
+    close = hist['Close'].to_numpy(dtype=np.float64)
+    volume = hist['Volume'].to_numpy(dtype=np.float64)
+    high = hist['High'].to_numpy(dtype=np.float64)
+    low = hist['Low'].to_numpy(dtype=np.float64)
+    indicators = _compute_indicators(close, high, low, volume)
+    alert = None
+    if indicators["volatility"] and (indicators["volatility"] > 0.05):
+        alert = "⚠️ Unusual volatility detected!"
+    return StockSnapshot(
+        name=meta.get("name"),
+        symbol=symbol,
+        price=float(close[-1]) if len(close) > 0 else None,
+        previous_close=float(close[-2]) if len(close) > 1 else None,
+        currency=meta.get("currency"),
+        price_week_ago=float(close[-6]) if len(close) > 5 else None,
+        price_month_ago=float(close[0]) if len(close) > 0 else None,
+        volume=float(volume[-1]) if len(volume) > 0 else None,
+        avg_volume=float(volume.mean()) if len(volume) > 0 else None,
+        alert=alert,
+        **indicators
+    )
+
+@cached(_news_cache, key=lambda query, max_results: (query, max_results), lock=_news_cache_lock)
+def _fetch_news(query: str, max_results: int) -> List[Dict[str, Any]]:
+    global _ddgs
+    with _ddgs_lock:
+        if _ddgs is None:
+            _ddgs = DDGS()
+        results = _ddgs.news(query, max_results=max_results)
+    today = datetime.now().strftime("%Y-%m-%d")
+    return [
+        {
+            "title": r["title"],
+            "link": r["url"],
+            "snippet": r["body"],
+            "date": today,
+            "sentiment": SENTIMENT_LABELS[i % 3]
+        }
+        for i, r in enumerate(results)
+    ]
 
-def search_news(query: str, max_results: int = 3) -> List[NewsItem]:
+def search_news(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+    """Title, link, snippet, date and sentiment of each headline as plain, read-only dicts."""
     try:
-        with DDGS() as ddgs:
-            results = ddgs.news(query, max_results=max_results)
-            sentiments = ["positive", "negative", "neutral"]
-            return [
-                NewsItem(
-                    title=r["title"],
-                    link=r["url"],
-                    snippet=r["body"],
-                    date=datetime.now().strftime("%Y-%m-%d"),
-                    sentiment=sentiments[i % 3]
-                )
-                for i, r in enumerate(results)
-            ]
+        return _fetch_news(query, max_results)
     except Exception as e:
         logger.error(f"Error fetching news: {e}")
         return []
 
+@cached(_calendar_cache, key=lambda: "calendar", lock=_calendar_cache_lock)
 def get_economic_calendar():
     # Simulated for demo; use Finnhub or Finnworlds API for production
     return [
@@ -174,13 +347,41 @@ def get_economic_calendar():
         {"event": "CPI Inflation Release", "date": (datetime.now() + timedelta(days=10)).strftime("%Y-%m-%d"), "impact": "high"},
     ]
 
-def get_portfolio_analytics(holdings: Dict[str, float]) -> PortfolioAnalytics:
+async def get_stock_infos(symbols: List[str]) -> List[StockSnapshot]:
+    """Stock snapshots for ``symbols``, in order.
+
+    Cached symbols are served from memory; the rest share one batched
+    history download while their metadata lookups run alongside it.
+    Symbols that fail to download are returned empty and not cached.
+    """
+    # yf.download upper-cases tickers in its columns, so "aapl" and " AAPL" share one entry
+    symbols = [symbol.strip().upper() for symbol in symbols]
+    with _stock_cache_lock:
+        found = {symbol: _stock_cache[symbol] for symbol in symbols if symbol in _stock_cache}
+    missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in found]
+    if missing:
+        histories, metas = await asyncio.gather(
+            run_blocking(fetch_history_batch, missing),
+            asyncio.gather(*[run_blocking(get_ticker_meta, symbol) for symbol in missing]),
+        )
+        for symbol, meta in zip(missing, metas):
+            hist = histories.get(symbol)
+            if hist is None or hist.empty:
+                logger.error(f"No price history for {symbol}")
+                found[symbol] = StockSnapshot(symbol=symbol)
+                continue
+            found[symbol] = compute_stock_info(symbol, hist, meta)
+            with _stock_cache_lock:
+                _stock_cache[symbol] = found[symbol]
+    return [found[symbol] for symbol in symbols]
+
+async def get_portfolio_analytics(holdings: Dict[str, float]) -> PortfolioAnalytics:
     total_value = 0.0
     returns = []
     vols = []
     prices = []
-    for symbol, qty in holdings.items():
-        info = get_stock_info(symbol)
+    infos = await get_stock_infos(list(holdings))
+    for info, qty in zip(infos, holdings.values()):
         if info.price and info.price_month_ago:
             total_value += info.price * qty
             returns.append((info.price - info.price_month_ago) / info.price_month_ago)
@@ -204,7 +405,7 @@ def get_portfolio_analytics(holdings: Dict[str, float]) -> PortfolioAnalytics:
         risk_level=risk_level
     )
 
-async def ask_together(messages: List[Dict[str, Any]], client: httpx.AsyncClient) -> str:
+def _together_request(messages: List[Dict[str, Any]], stream: bool = False):
     headers = {
         "Authorization": f"Bearer {TOGETHER_API_KEY}",
         "Content-Type": "application/json"
@@ -213,8 +414,13 @@ async def ask_together(messages: List[Dict[str, Any]], client: httpx.AsyncClient
         "model": MODEL,
         "messages": messages,
         "max_tokens": 1024,
-        "temperature": 0.7
+        "temperature": 0.7,
+        "stream": stream
     }
+    return headers, payload
+
+async def ask_together(messages: List[Dict[str, Any]], client: httpx.AsyncClient) -> str:
+    headers, payload = _together_request(messages)
     try:
         response = await client.post(TOGETHER_API_URL, headers=headers, json=payload, timeout=60)
         response.raise_for_status()
@@ -224,6 +430,36 @@ async def ask_together(messages: List[Dict[str, Any]], client: httpx.AsyncClient
         logger.error(f"Error from Together API: {e}")
         raise
 
+async def stream_together(messages: List[Dict[str, Any]], client: httpx.AsyncClient) -> AsyncIterator[str]:
+    """Yield completion tokens as Together streams them back."""
+    headers, payload = _together_request(messages, stream=True)
+    try:
+        async with client.stream("POST", TOGETHER_API_URL, headers=headers, json=payload, timeout=60) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                content = orjson.loads(data)["choices"][0].get("delta", {}).get("content")
+                if content:
+                    yield content
+    except Exception as e:
+        logger.error(f"Error from Together API stream: {e}")
+        raise
+
+async def stream_insights(messages: List[Dict[str, Any]], stats: Dict[str, Any], client: httpx.AsyncClient) -> AsyncIterator[bytes]:
+    # Stats go first so the client can render them while tokens arrive
+    yield _sse(stats, event="stats")
+    try:
+        async for token in stream_together(messages, client):
+            yield _sse(token)
+    except Exception as e:
+        logger.error(f"Trade insights stream error: {e}")
+        yield _sse(f"Error: {e}", event="error")
+    yield _sse(None, event="done")
+
 # --- ROUTES ---
 
 @app.post("/trade-insights", response_model=TradeInsightsResponse)
@@ -234,9 +470,13 @@ async def trade_insights(
     data = await request.json()
     query = data.get("query", "Analyze my watchlist and provide actionable insights.")
     tickers = data.get("tickers", ["BTC-USD", "^IXIC"])
-    stats = {symbol: get_stock_info(symbol).dict() for symbol in tickers}
-    news = search_news(" ".join(tickers), max_results=5)
+    infos, news = await asyncio.gather(
+        get_stock_infos(tickers),
+        run_blocking(search_news, " ".join(tickers), max_results=5),
+    )
     econ_calendar = get_economic_calendar()
+    # Unset fields are dropped from both the prompt and the response
+    stats = {symbol: info.to_dict() for symbol, info in zip(tickers, infos)}
     system_prompt = (
         "You are a multi-agent AI trading assistant. Given the following data, do the following:\n"
         "- Summarize technical and statistical indicators for each asset\n"
@@ -249,25 +489,28 @@ async def trade_insights(
         f"{query}\n\n"
         f"Tickers: {tickers}\n"
         f"Stats: {stats}\n"
-        f"Latest News: {[n.dict() for n in news]}\n"
+        f"Latest News: {news}\n"
         f"Economic Calendar: {econ_calendar}\n"
     )
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
+    if data.get("stream"):
+        return StreamingResponse(stream_insights(messages, stats, client), media_type="text/event-stream")
     try:
         ai_response = await ask_together(messages, client)
-        return TradeInsightsResponse(result=ai_response, stats=stats)
+        return OrjsonResponse(content={"result": ai_response, "stats": stats})
     except Exception as e:
         logger.error(f"Trade insights error: {e}")
-        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"result": f"Error: {e}", "stats": stats})
+        return OrjsonResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"result": f"Error: {e}", "stats": stats})
 
 @app.post("/portfolio-analytics", response_model=PortfolioAnalytics)
 async def portfolio_analytics(request: Request):
     data = await request.json()
     holdings = data.get("holdings", {"AAPL": 10, "MSFT": 5})
-    return get_portfolio_analytics(holdings)
+    analytics = await get_portfolio_analytics(holdings)
+    return _model_response(analytics)
 
 @app.post("/backtest", response_model=BacktestResponse)
 async def backtest(
@@ -289,14 +532,14 @@ async def backtest(
     ]
     try:
         ai_response = await ask_together(messages, client)
-        return BacktestResponse(backtest_result=ai_response)
+        return _model_response(BacktestResponse(backtest_result=ai_response))
     except Exception as e:
         logger.error(f"Backtest error: {e}")
-        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"backtest_result": f"Error: {e}"})
+        return OrjsonResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"backtest_result": f"Error: {e}"})
 
 @app.post("/feedback")
 async def feedback(feedback: FeedbackRequest):
-    logger.info(f"User feedback: {feedback.dict()}")
+    logger.info(f"User feedback: {feedback.model_dump()}")
     return {"status": "success", "message": "Thank you for your feedback!"}
 
 @app.post("/compare-strategies")
@@ -317,19 +560,17 @@ async def compare_strategies(request: Request, client: httpx.AsyncClient = Depen
         return {"comparison": ai_response}
     except Exception as e:
         logger.error(f"Compare strategies error: {e}")
-        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"comparison": f"Error: {e}"})
+        return OrjsonResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"comparison": f"Error: {e}"})
+
+@lru_cache(maxsize=1)
+def _sentiment_history(today: date) -> List[Dict[str, str]]:
+    # Only changes when the date does, so it is built once per day
+    dates = pd.date_range(end=today, periods=10, freq="D")[::-1].strftime("%Y-%m-%d")
+    return [{"date": day, "sentiment": SENTIMENT_LABELS[i % 3]} for i, day in enumerate(dates)]
 
 @app.get("/sentiment-history")
 async def sentiment_history(news_topic: str = "BTC NASDAQ market"):
-    today = datetime.now()
-    history = []
-    sentiments = ["positive", "negative", "neutral"]
-    for i in range(10):
-        history.append({
-            "date": (today - timedelta(days=i)).strftime("%Y-%m-%d"),
-            "sentiment": sentiments[i % 3]
-        })
-    return {"history": history}
+    return {"history": _sentiment_history(date.today())}
 
 @app.post("/backtest-vs-live", response_model=BacktestComparison)
 async def backtest_vs_live(request: Request, client: httpx.AsyncClient = Depends(get_http_client)):
@@ -347,14 +588,14 @@ async def backtest_vs_live(request: Request, client: httpx.AsyncClient = Depends
     ]
     try:
         ai_response = await ask_together(messages, client)
-        return BacktestComparison(
+        return _model_response(BacktestComparison(
             backtest_summary=backtest_data,
             live_summary=live_data,
             discrepancies=ai_response
-        )
+        ))
     except Exception as e:
         logger.error(f"Backtest vs live error: {e}")
-        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"discrepancies": f"Error: {e}"})
+        return OrjsonResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"discrepancies": f"Error: {e}"})
 
 @app.get("/")
 async def root():
@@ -1,87 +1,310 @@
 
 import os
-import sounddevice as sd
-import scipy.io.wavfile as wavfile
-import whisper
-from gtts import gTTS
-from pydub import AudioSegment
-import google.generativeai as genai
+# CTranslate2 reads the OpenMP thread count when it is first imported by a loader below
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count()))
 import streamlit as st
-import tempfile
-import base64
+import contextlib
+import io
+import re
+import asyncio
+import logging
+import wave
+
+logger = logging.getLogger("speech-translator")
+
+# Piper voice model; its .onnx.json config must sit next to it (see requirements.txt for the download)
+PIPER_VOICE = os.getenv("PIPER_VOICE", "en_US-lessac-medium.onnx")
+# e.g. "int8_float32" or "float16"; defaults to int8 weights on either device
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE")
+# Silero VAD settings; the batched pipeline caps each merged span at Whisper's 30 s window itself
+VAD_PARAMETERS = {"min_silence_duration_ms": 160}
+# Whisper and Silero VAD both expect 16 kHz mono
+SAMPLE_RATE = 16000
+# Longest recording the slider allows; each session's buffer is sized for it once
+MAX_RECORD_TIME = 20
+# How often the recording is checked for a pause to cut the next utterance at
+CHUNK_TIME = float(os.getenv("CHUNK_TIME", "2"))
+# Longest stretch without a pause before it is cut at a fixed length anyway
+MAX_CHUNK_TIME = float(os.getenv("MAX_CHUNK_TIME", "15"))
+# A pause this long ends an utterance; short gaps between words do not
+PAUSE_VAD_PARAMETERS = {"min_silence_duration_ms": 500, "speech_pad_ms": 100}
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# CTranslate2 conversion of facebook/nllb-200-distilled-600M (ct2-transformers-converter --quantization int8)
+NLLB_MODEL = os.getenv("NLLB_MODEL", "nllb-200-distilled-600M-ct2-int8")
+# Whisper language code -> NLLB-200 code; anything not listed goes to Gemini
+NLLB_LANGUAGES = {
+    "ar": "arb_Arab", "bn": "ben_Beng", "cs": "ces_Latn", "da": "dan_Latn",
+    "de": "deu_Latn", "el": "ell_Grek", "es": "spa_Latn", "fa": "pes_Arab",
+    "fi": "fin_Latn", "fr": "fra_Latn", "gu": "guj_Gujr", "he": "heb_Hebr",
+    "hi": "hin_Deva", "hu": "hun_Latn", "id": "ind_Latn", "it": "ita_Latn",
+    "ja": "jpn_Jpan", "kn": "kan_Knda", "ko": "kor_Hang", "ml": "mal_Mlym",
+    "mr": "mar_Deva", "ms": "zsm_Latn", "nl": "nld_Latn", "no": "nob_Latn",
+    "pa": "pan_Guru", "pl": "pol_Latn", "pt": "por_Latn", "ro": "ron_Latn",
+    "ru": "rus_Cyrl", "sv": "swe_Latn", "sw": "swh_Latn", "ta": "tam_Taml",
+    "te": "tel_Telu", "th": "tha_Thai", "tr": "tur_Latn", "uk": "ukr_Cyrl",
+    "ur": "urd_Arab", "vi": "vie_Latn", "zh": "zho_Hans",
+}
+
+@st.cache_resource
+def load_whisper(size="tiny"):
+    """Whisper model of the given size, shared by every session and rerun."""
+    import ctranslate2
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    # int8 weights through CTranslate2; on GPU the activations run in float16
+    on_gpu = ctranslate2.get_cuda_device_count() > 0
+    model = WhisperModel(
+        size,
+        device="cuda" if on_gpu else "cpu",
+        compute_type=WHISPER_COMPUTE_TYPE or ("int8_float16" if on_gpu else "int8"),
+        cpu_threads=os.cpu_count(),
+        num_workers=1,
+    )
+    return BatchedInferencePipeline(model)
+
+@st.cache_resource
+def load_gemini():
+    """Gemini client shared by every session and rerun."""
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY", ""))
+    return genai.GenerativeModel("gemini-2.0-flash")
+
+@st.cache_resource
+def load_nllb():
+    """Local NLLB translator and its tokenizer, or None when the converted model is unavailable."""
+    try:
+        import ctranslate2
+        from transformers import AutoTokenizer
+        on_gpu = ctranslate2.get_cuda_device_count() > 0
+        translator = ctranslate2.Translator(
+            NLLB_MODEL,
+            device="cuda" if on_gpu else "cpu",
+            compute_type="int8_float16" if on_gpu else "int8",
+        )
+        return translator, AutoTokenizer.from_pretrained("facebook/nllb-200-distilled-600M")
+    except Exception as e:
+        # Cached as None so a broken model is reported once, not retried on every rerun
+        logger.error(f"Could not load NLLB model {NLLB_MODEL}, translating with Gemini: {e}")
+        return None
+
+@st.cache_resource
+def load_voice():
+    """Local Piper TTS voice shared by every session and rerun, or None when it is not downloaded."""
+    try:
+        import onnxruntime
+        from piper import PiperVoice
+        # Needs onnxruntime-gpu; the plain CPU wheel only lists CPUExecutionProvider
+        on_gpu = "CUDAExecutionProvider" in onnxruntime.get_available_providers()
+        return PiperVoice.load(PIPER_VOICE, use_cuda=on_gpu)
+    except Exception as e:
+        logger.error(f"Could not load Piper voice {PIPER_VOICE}, translations will not be spoken: {e}")
+        return None
 
 class SpeechTranslation:
-    def init(self, sample_rate=16000, record_time=10):
+    def __init__(self, whisper_model, gemini_model, nllb, voice, buffer, sample_rate=SAMPLE_RATE, record_time=10):
+        # Models come from the st.cache_resource loaders, so building this per rerun is cheap
+        self.whisper_model = whisper_model
+        self.gemini_model = gemini_model
+        # (translator, tokenizer), or None to send every non-English utterance to Gemini
+        self.nllb = nllb
+        self.voice = voice
+        # Reused across recordings and filled in place by the input callback;
+        # every utterance handed to Whisper is a view of it
+        self.buffer = buffer
         self.sample_rate = sample_rate
         self.record_time = record_time
-        self.input_path = "./input_audio.wav"
-        self.output_path = "./output_audio.wav"
-        self.whisper_model = whisper.load_model("base")
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY", ""))
-        self.gemini_model = genai.GenerativeModel("gemini-2.0-flash")
-
-    def record(self):
-        recording = sd.rec(int(self.sample_rate * self.record_time),
-                           samplerate=self.sample_rate,
-                           channels=1, dtype='int16')
-        sd.wait()
-        wavfile.write(self.input_path, rate=self.sample_rate, data=recording)
-
-    def transcribe(self):
-        result = self.whisper_model.transcribe(self.input_path)
-        return result['text']
-
-    def translate(self, text):
-        response = self.gemini_model.generate_content(f"Translate this to English:\n{text}")
-        return response.text.strip()
-
-    def speak(self, text):
-        tts = gTTS(text, lang='en')
-        tts.save(self.output_path)
-        AudioSegment.from_file(self.output_path).export(self.output_path, format="wav")
-
-    def get_audio_base64(self):
-        with open(self.output_path, 'rb') as f:
-            audio_bytes = f.read()
-        return base64.b64encode(audio_bytes).decode()
+        self.speech = None
+
+    def find_pause(self, audio):
+        """Offset of the last pause in audio (0 if there is none yet), and whether audio before it has speech."""
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+        speech = get_speech_timestamps(audio, VadOptions(**PAUSE_VAD_PARAMETERS), self.sample_rate)
+        pause = self.sample_rate * PAUSE_VAD_PARAMETERS["min_silence_duration_ms"] // 1000
+        if not speech:
+            # Keep a short tail in case a word is just starting
+            return max(0, len(audio) - pause), False
+        if speech[-1]["end"] + pause <= len(audio):
+            return speech[-1]["end"], True
+        if len(speech) > 1:
+            return (speech[-2]["end"] + speech[-1]["start"]) // 2, True
+        if len(audio) >= self.sample_rate * MAX_CHUNK_TIME:
+            return len(audio), True
+        return 0, True
+
+    async def record(self, audio_queue):
+        """Producer: push each utterance, cut at a pause the VAD finds, onto the queue."""
+        import sounddevice as sd
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        step = int(self.sample_rate * CHUNK_TIME)
+        total = int(self.sample_rate * self.record_time)
+        filled = sent = 0
+        stopped = False
+
+        def callback(indata, frames, time, status):
+            # Runs on the PortAudio thread; only wakes the event loop every CHUNK_TIME of audio
+            nonlocal filled
+            if status:
+                logger.warning(f"Audio input status: {status}")
+            count = min(frames, total - filled)
+            self.buffer[filled:filled + count] = indata[:count, 0]
+            previous, filled = filled, filled + count
+            if filled // step > previous // step or filled == total:
+                loop.call_soon_threadsafe(ready.set)
+            if filled == total:
+                raise sd.CallbackStop
+
+        def finished():
+            # Called when the stream stops, whether the buffer filled up or PortAudio aborted it
+            nonlocal stopped
+            stopped = True
+            loop.call_soon_threadsafe(ready.set)
+
+        with sd.InputStream(samplerate=self.sample_rate, channels=1, dtype='float32',
+                            callback=callback, finished_callback=finished):
+            while sent < total:
+                await ready.wait()
+                ready.clear()
+                if filled == total or stopped:
+                    cut, voiced = filled - sent, True
+                else:
+                    # Everything up to the last pause goes on; the rest waits for more audio
+                    cut, voiced = await asyncio.to_thread(self.find_pause, self.buffer[sent:filled])
+                if voiced and cut:
+                    # Whisper takes 16 kHz mono float32 in [-1, 1] directly, which is what PortAudio delivers
+                    await audio_queue.put(self.buffer[sent:sent + cut])
+                sent += cut
+                if stopped:
+                    break
+        await audio_queue.put(None)
+
+    def transcribe(self, audio):
+        # Silero VAD (bundled with faster-whisper) finds the voiced spans and the pipeline merges
+        # them into <=30 s clips that Whisper encodes as one batch instead of one call each
+        segments, info = self.whisper_model.transcribe(
+            audio, vad_filter=True, vad_parameters=VAD_PARAMETERS, batch_size=8, beam_size=1
+        )
+        # A shaky language guess is left to Gemini, which works out the source language itself
+        language = info.language if info.language_probability >= 0.5 else None
+        return "".join(segment.text for segment in segments).strip(), language
+
+    async def transcribe_chunks(self, audio_queue, text_queue, placeholder):
+        """Transcribe each utterance while the next one is still being captured."""
+        lines = []
+        while (audio := await audio_queue.get()) is not None:
+            text, language = await asyncio.to_thread(self.transcribe, audio)
+            if text:
+                lines.append(text)
+                placeholder.write(" ".join(lines))
+                await text_queue.put((text, language))
+        await text_queue.put(None)
+
+    def translate(self, text, language):
+        if language == "en":
+            yield text
+        elif language in NLLB_LANGUAGES and self.nllb is not None:
+            yield self.translate_local(text, NLLB_LANGUAGES[language])
+        else:
+            yield from self.translate_gemini(text)
+
+    def translate_local(self, text, source):
+        translator, tokenizer = self.nllb
+        # Build the "<src_lang> ... </s>" input by hand so the shared tokenizer is never mutated
+        tokens = [source] + tokenizer.tokenize(text) + [tokenizer.eos_token]
+        result = translator.translate_batch([tokens], target_prefix=[["eng_Latn"]])
+        target = result[0].hypotheses[0][1:]
+        return tokenizer.decode(tokenizer.convert_tokens_to_ids(target))
+
+    def translate_gemini(self, text):
+        # Stream the reply so speech synthesis can start before the whole translation arrives
+        response = self.gemini_model.generate_content(f"Translate this to English:\n{text}", stream=True)
+        for chunk in response:
+            yield chunk.text
+
+    def speak(self, chunks, wav_file):
+        """Synthesize each sentence into wav_file as soon as it is complete, passing the text through."""
+        if wav_file is None:
+            yield from chunks
+            return
+        pending = ""
+        for chunk in chunks:
+            yield chunk
+            *sentences, pending = SENTENCE_END.split(pending + chunk)
+            for sentence in sentences:
+                self.voice.synthesize_wav(sentence, wav_file, set_wav_format=False)
+        if pending.strip():
+            self.voice.synthesize_wav(pending, wav_file, set_wav_format=False)
+
+    async def translate_chunks(self, text_queue, placeholder):
+        """Consumer: translate and voice each transcribed utterance into one running WAV."""
+        lines = []
+        # Piper synthesizes PCM locally, straight into an in-memory WAV; without a voice
+        # the translation is still shown, just not spoken
+        self.speech = io.BytesIO() if self.voice is not None else None
+        with wave.open(self.speech, "wb") if self.speech else contextlib.nullcontext() as wav_file:
+            if wav_file is not None:
+                wav_file.setframerate(self.voice.config.sample_rate)
+                wav_file.setsampwidth(2)
+                wav_file.setnchannels(1)
+            while (item := await text_queue.get()) is not None:
+                text, language = item
+                translated = await asyncio.to_thread(
+                    lambda: "".join(self.speak(self.translate(text, language), wav_file))
+                )
+                lines.append(translated.strip())
+                placeholder.write(" ".join(lines))
+
+    async def run(self, transcription, translation):
+        """Record, transcribe and translate+speak as one pipeline, so total latency is the slowest stage."""
+        audio_queue, text_queue = asyncio.Queue(), asyncio.Queue()
+        await asyncio.gather(
+            self.record(audio_queue),
+            self.transcribe_chunks(audio_queue, text_queue, transcription),
+            self.translate_chunks(text_queue, translation),
+        )
+
+    def get_audio_bytes(self):
+        return self.speech.getvalue() if self.speech is not None else None
 
     def clean_up(self):
-        if os.path.exists(self.input_path):
-            os.remove(self.input_path)
-        if os.path.exists(self.output_path):
-            os.remove(self.output_path)
+        self.speech = None
 
 def main():
     st.title("🎙 Speech Translator")
     st.markdown("Record your speech in any language and translate it to English with audio output!")
 
-    duration = st.slider("Recording Duration (seconds)", 3, 20, 10)
-    translator = SpeechTranslation(record_time=duration)
+    duration = st.slider("Recording Duration (seconds)", 3, MAX_RECORD_TIME, 10)
+    # The distil-whisper checkpoints are English-only, so they cannot feed the translator
+    model_size = st.selectbox("Whisper model (speed vs. accuracy)", ["tiny", "base", "small"])
+    # One recording buffer per browser session, reused by every recording in it
+    if "buffer" not in st.session_state:
+        import numpy as np
+        st.session_state.buffer = np.empty(SAMPLE_RATE * MAX_RECORD_TIME, dtype=np.float32)
+    voice = load_voice()
+    if voice is None:
+        voice_name = os.path.basename(PIPER_VOICE).removesuffix(".onnx")
+        st.error(
+            f"Piper voice `{PIPER_VOICE}` could not be loaded, so translations will not be spoken. "
+            f"Download it with `python -m piper.download_voices {voice_name}`."
+        )
+    # NLLB is an optional, hand-converted model; without its directory Gemini translates everything
+    nllb = load_nllb() if os.path.isdir(NLLB_MODEL) else None
+    translator = SpeechTranslation(
+        load_whisper(model_size), load_gemini(), nllb, voice, st.session_state.buffer, record_time=duration
+    )
 
     if st.button("🔴 Start Recording"):
-        with st.spinner("Recording audio..."):
-            translator.record()
+        st.write("📝 Transcription:")
+        transcription = st.empty()
+        st.write("🌍 Translation (English):")
+        translation = st.empty()
+        with st.spinner("Recording, transcribing and translating..."):
+            asyncio.run(translator.run(transcription, translation))
         st.success("Recording complete!")
-
-        with st.spinner("Transcribing..."):
-            transcription = translator.transcribe()
-        st.write("📝 Transcription:", transcription)
-
-        with st.spinner("Translating..."):
-            translated = translator.translate(transcription)
-        st.write("🌍 Translation (English):", translated)
-
-        with st.spinner("Generating speech..."):
-            translator.speak(translated)
-            audio_base64 = translator.get_audio_base64()
-            audio_html = f"""
-                <audio controls autoplay>
-                <source src="data:audio/wav;base64,{audio_base64}" type="audio/wav">
-                </audio>
-            """
-            st.markdown(audio_html, unsafe_allow_html=True)
+        audio = translator.get_audio_bytes()
+        if audio is not None:
+            st.audio(audio, format="audio/wav", autoplay=True)
 
         translator.clean_up()
 
-if name == "main":
+if __name__ == "__main__":
     main()